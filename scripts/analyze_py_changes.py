@@ -1,12 +1,17 @@
 import ast
+import io
 import os
+import re
 import sys
 import subprocess
+import tokenize
 import json
-from typing import List, Dict, Any, Set, Optional, Tuple
-from github import Github
-import requests
-import json
+from typing import TYPE_CHECKING, List, Dict, Any, Set, Optional, Tuple
+
+# Network backends (PyGithub, requests) are imported inside the functions that
+# use them so local-only runs don't pay their import cost.
+if TYPE_CHECKING:
+    from github import Github
 
 def get_env_vars() -> Tuple[Optional[str], Optional[str]]:
     """Get GitHub token and repository name from environment variables."""
@@ -21,7 +26,7 @@ def get_env_vars() -> Tuple[Optional[str], Optional[str]]:
     print(f"Environment check - Token present: {'Yes' if token else 'No'}, Repo present: {'Yes' if repo else 'No'}")
     return token, repo
 
-def get_github_client() -> Optional[Github]:
+def get_github_client() -> Optional["Github"]:
     """Get authenticated GitHub client."""
     token, repo = get_env_vars()
     if not token or not repo:
@@ -29,6 +34,7 @@ def get_github_client() -> Optional[Github]:
         return None
     
     try:
+        from github import Github
         return Github(token)
     except Exception as e:
         print(f"ERROR: Failed to create GitHub client: {e}")
@@ -59,6 +65,7 @@ def get_file_content(file_path: str) -> str:
     if token and repo:
         try:
             print(f"Attempting to get file content using GitHub API: {file_path}")
+            from github import Github
             g = Github(token)
             repo_obj = g.get_repo(repo)
             content = repo_obj.get_contents(file_path, ref="HEAD").decoded_content.decode('utf-8')
@@ -92,6 +99,7 @@ def get_previous_content(file_path: str) -> str:
     if token and repo:
         try:
             print(f"Attempting to get previous version using GitHub API: {file_path}")
+            from github import Github
             g = Github(token)
             repo_obj = g.get_repo(repo)
             # Get the previous commit
@@ -120,6 +128,132 @@ def get_previous_content(file_path: str) -> str:
         print(f"Error getting previous version from git: {e}")
         return None
 
+# Git's well-known empty tree, used as the base when a push creates a branch
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+RANGE_PATH_PREFIX = "src/"
+RANGE_PATH_SUFFIX = ".py"
+
+_CAT_FILE_HEADER = re.compile(rb'^[0-9a-f]{40,64} blob (\d+)$')
+
+def _is_null_sha(sha: Optional[str]) -> bool:
+    return not sha or set(sha) == {'0'}
+
+def _is_range_path(path: str) -> bool:
+    return path.startswith(RANGE_PATH_PREFIX) and path.endswith(RANGE_PATH_SUFFIX)
+
+def _plan_commit_range_github(before: str, after: str) -> Optional[List[Dict[str, str]]]:
+    """Compute the changed file set with a single GitHub compare call."""
+    g = get_github_client()
+    if not g:
+        return None
+    _, repo_name = get_env_vars()
+    if _is_null_sha(before):
+        # Compare rejects the empty tree, so a new branch lists every file at after as added
+        try:
+            tree = g.get_repo(repo_name).get_git_tree(after, recursive=True)
+        except Exception as e:
+            print(f"Error listing tree {after} with GitHub API: {e}")
+            return None
+        return [{'path': item.path, 'status': 'A'} for item in tree.tree
+                if item.type == 'blob' and _is_range_path(item.path)]
+
+    statuses = {'added': 'A', 'removed': 'D', 'modified': 'M', 'changed': 'M'}
+    try:
+        comparison = g.get_repo(repo_name).compare(before, after)
+    except Exception as e:
+        print(f"Error comparing {before}...{after} with GitHub API: {e}")
+        return None
+    plan = []
+    for f in comparison.files:
+        if f.status == 'renamed':
+            plan.append({'path': f.previous_filename, 'status': 'D'})
+            plan.append({'path': f.filename, 'status': 'A'})
+        else:
+            plan.append({'path': f.filename, 'status': statuses.get(f.status, 'M')})
+    return [entry for entry in plan if _is_range_path(entry['path'])]
+
+def plan_commit_range(before: str, after: str) -> List[Dict[str, str]]:
+    """Compute the net set of changed Python files between a push's before and after commits.
+
+    Uses one tree-to-tree diff, so a file touched by many commits in the push
+    appears once and intermediate commits are never visited.
+    """
+    base = EMPTY_TREE_SHA if _is_null_sha(before) else before
+    result = subprocess.run(['git', 'diff', '--name-status', '-z', '--no-renames', base, after],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error diffing {base}..{after} with git: {result.stderr.strip()}")
+        plan = _plan_commit_range_github(before, after)
+        if plan is None:
+            print("ERROR: Could not plan commit range")
+            return []
+        return plan
+
+    fields = result.stdout.split('\0')
+    plan = []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        if _is_range_path(path):
+            plan.append({'path': path, 'status': status[:1]})
+    return plan
+
+def _decode_source(data: bytes, rev: str) -> str:
+    """Decode a Python source blob, honouring its coding cookie and replacing undecodable bytes."""
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        return data.decode(encoding)
+    except (SyntaxError, LookupError, UnicodeDecodeError) as e:
+        print(f"WARNING: Could not decode {rev} ({e}), replacing invalid bytes")
+        return data.decode('utf-8', errors='replace')
+
+def get_range_contents(before: str, after: str, plan: List[Dict[str, str]]) -> Dict[str, Tuple[str, str]]:
+    """Fetch exactly one old and one new blob per planned file, keyed by path as (old, new).
+
+    Added files have an empty old blob and deleted files an empty new blob.
+    All blobs are read through a single `git cat-file --batch` process, with
+    the GitHub API as a fallback for objects missing from a shallow clone.
+    """
+    wanted = []
+    for entry in plan:
+        if entry['status'] != 'A' and not _is_null_sha(before):
+            wanted.append((entry['path'], 0, f"{before}:{entry['path']}"))
+        if entry['status'] != 'D':
+            wanted.append((entry['path'], 1, f"{after}:{entry['path']}"))
+
+    blobs: Dict[Tuple[str, int], str] = {}
+    missing = []
+    if wanted:
+        batch_input = "".join(f"{rev}\n" for _, _, rev in wanted).encode('utf-8')
+        result = subprocess.run(['git', 'cat-file', '--batch'], input=batch_input, capture_output=True)
+        output = result.stdout
+        pos = 0
+        for path, side, rev in wanted:
+            header_end = output.find(b'\n', pos)
+            if header_end == -1:
+                header_end = len(output)
+            header = _CAT_FILE_HEADER.match(output[pos:header_end])
+            if not header:
+                # "<rev> missing" for objects absent from a shallow clone
+                missing.append((path, side, rev))
+                pos = header_end + 1
+                continue
+            size = int(header.group(1))
+            start = header_end + 1
+            blobs[(path, side)] = _decode_source(output[start:start + size], rev)
+            pos = start + size + 1
+
+    g = get_github_client() if missing else None
+    if g:
+        _, repo_name = get_env_vars()
+        for path, side, rev in missing:
+            ref, _, file_path = rev.partition(':')
+            try:
+                print(f"Fetching {rev} with GitHub API")
+                blobs[(path, side)] = _decode_source(g.get_repo(repo_name).get_contents(file_path, ref=ref).decoded_content, rev)
+            except Exception as e:
+                print(f"Error getting {rev} from GitHub API: {e}")
+
+    return {entry['path']: (blobs.get((entry['path'], 0), ""), blobs.get((entry['path'], 1), "")) for entry in plan}
+
 def extract_api_elements(content: str) -> Dict[str, Dict[str, Any]]:
     """Extract API elements (functions, classes) from Python code with their signatures and docstrings."""
     if not content:
@@ -132,14 +266,20 @@ def extract_api_elements(content: str) -> Dict[str, Dict[str, Any]]:
         return {}
     
     elements = {}
+    # Methods and nested classes are keyed as Class.name so same-named members don't collide
+    parents = {}
     
     for node in ast.walk(tree):
+        parent = parents.get(id(node))
+        key = f"{parent}.{node.name}" if parent else getattr(node, 'name', None)
         if isinstance(node, ast.FunctionDef):
             # Get function signature
             args = []
+            params = []
             for arg in node.args.args:
                 arg_type = ast.unparse(arg.annotation) if arg.annotation else 'Any'
                 args.append(f"{arg.arg}: {arg_type}")
+                params.append((arg.arg, arg_type))
             
             # Get return type
             return_type = ast.unparse(node.returns) if node.returns else 'Any'
@@ -147,19 +287,29 @@ def extract_api_elements(content: str) -> Dict[str, Dict[str, Any]]:
             # Get docstring
             docstring = ast.get_docstring(node) or ""
             
-            elements[node.name] = {
+            elements[key] = {
                 'type': 'function',
                 'signature': f"({', '.join(args)}) -> {return_type}",
-                'docstring': docstring
+                'docstring': docstring,
+                'params': params,
+                'returns': return_type
             }
+            if parent:
+                elements[key]['parent'] = parent
         elif isinstance(node, ast.ClassDef):
             # Get class docstring
             docstring = ast.get_docstring(node) or ""
             
-            elements[node.name] = {
+            elements[key] = {
                 'type': 'class',
                 'docstring': docstring
             }
+            if parent:
+                elements[key]['parent'] = parent
+            # ast.walk visits a class before its body, so members find their parent here
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.ClassDef)):
+                    parents[id(child)] = key
     
     return elements
 
@@ -265,6 +415,7 @@ def create_api_failure_issue(file_path: str, changes: Dict[str, List[str]]) -> N
         repo_name = get_repo_name()
         
         # Initialize GitHub client
+        from github import Github
         g = Github(token)
         repo = g.get_repo(repo_name)
         
@@ -348,6 +499,96 @@ def create_github_issue(title: str, body: str) -> None:
         print(f"Title: {title}")
         print(f"Body:\n{body}")
 
+GEMINI_API_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash"
+GEMINI_TIMEOUT = 60
+
+_VERDICT_PATTERN = re.compile(r'"change_required"\s*:\s*(true|false)')
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Extract the first JSON object from model output, ignoring markdown fences or other wrapping text."""
+    decoder = json.JSONDecoder()
+    start = text.find('{')
+    while start != -1:
+        try:
+            obj, _ = decoder.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
+class VerdictParser:
+    """Accumulates streamed model text and reports the change_required verdict as soon as it appears."""
+
+    def __init__(self):
+        self.text = ""
+        self.change_required: Optional[bool] = None
+
+    def feed(self, chunk: str) -> Optional[bool]:
+        """Add a chunk of output and return the verdict if it is known yet."""
+        self.text += chunk
+        if self.change_required is None:
+            # The verdict comes first and the buffer is small until then, so rescan all of it;
+            # a tail-only scan would miss a verdict split across chunks by arbitrary whitespace
+            match = _VERDICT_PATTERN.search(self.text)
+            if match:
+                self.change_required = match.group(1) == 'true'
+        return self.change_required
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Return the parsed response, or None if no verdict could be recovered."""
+        parsed = extract_json_object(self.text)
+        if parsed is not None and "change_required" in parsed:
+            return parsed
+        if self.change_required is not None:
+            return {"change_required": self.change_required, "updated_doc": None}
+        return None
+
+def stream_documentation_verdict(prompt: str, api_key: str) -> Dict[str, Any]:
+    """Stream a Gemini response and stop as soon as it says no documentation change is required."""
+    import requests
+
+    base_url = os.getenv("GEMINI_API_BASE_URL", GEMINI_API_BASE_URL)
+    API_URL = f"{base_url}:streamGenerateContent?alt=sse&key={api_key}"
+
+    headers = {
+        "Content-Type": "application/json"
+    }
+
+    data = {
+        "contents": [
+            {
+                "parts": [{"text": prompt}]
+            }
+        ]
+    }
+
+    parser = VerdictParser()
+    # Leaving the with block closes the connection, which cancels the rest of the generation
+    with requests.post(API_URL, headers=headers, data=json.dumps(data), stream=True, timeout=GEMINI_TIMEOUT) as response:
+        if response.status_code != 200:
+            print(f"ERROR: Gemini API call failed: {response.status_code} - {response.text}")
+            return {"change_required": True, "updated_doc": None}
+
+        # SSE is always UTF-8; requests would decode text/event-stream as ISO-8859-1
+        for raw_line in response.iter_lines(chunk_size=None):
+            line = raw_line.decode('utf-8')
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            for candidate in event.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if parser.feed(part.get("text", "")) is False:
+                        print("Gemini reported no documentation change required, stopping stream early")
+                        return {"change_required": False, "updated_doc": None}
+
+    result = parser.result()
+    if result is None:
+        print("ERROR: Failed to parse Gemini output as JSON")
+        return {"change_required": True, "updated_doc": None}
+    return result
+
 def check_documentation(file_path: str, content: str) -> dict:
     """Check if documentation needs to be updated using Gemini API."""
     try:
@@ -355,14 +596,8 @@ def check_documentation(file_path: str, content: str) -> dict:
         if not API_KEY:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-        API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={API_KEY}"
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         prompt = f"""Analyze the following Python code and determine if documentation needs to be updated in concise form.
-        Return a JSON response with two fields:
+        Return a JSON response with two fields, in this order:
         1. change_required: boolean indicating if documentation needs to be updated
         2. updated_doc: string containing the updated documentation if change_required is true, null otherwise
 
@@ -374,37 +609,18 @@ def check_documentation(file_path: str, content: str) -> dict:
 
         Return only the JSON response, no other text."""
 
-        data = {
-            "contents": [
-                {
-                    "parts": [{"text": prompt}]
-                }
-            ]
-        }
-
-        response = requests.post(API_URL, headers=headers, data=json.dumps(data))
-
-        if response.status_code != 200:
-            print(f"ERROR: Gemini API call failed: {response.status_code} - {response.text}")
-            return {"change_required": True, "updated_doc": None}
-
-        result = response.json()
-        raw_output = result["candidates"][0]["content"]["parts"][0]["text"]
-
-        # Try parsing the output as JSON
-        try:
-            parsed_output = json.loads(raw_output)
-            return parsed_output
-        except json.JSONDecodeError:
-            print("ERROR: Failed to parse Gemini output as JSON")
-            return {"change_required": True, "updated_doc": None}
+        return stream_documentation_verdict(prompt, API_KEY)
 
     except Exception as e:
         print(f"ERROR: Failed to check documentation: {e}")
         return {"change_required": True, "updated_doc": None}
 
-def analyze_changes(file_path: str) -> None:
-    """Analyze changes between current and previous versions of a file."""
+def analyze_changes(file_path: str, current_content: Optional[str] = None,
+                    previous_content: Optional[str] = None) -> None:
+    """Analyze changes between current and previous versions of a file.
+
+    Contents that are not passed in are fetched from the filesystem, git or GitHub.
+    """
     if not file_path or not isinstance(file_path, str):
         print("ERROR: Invalid file path provided")
         return
@@ -412,7 +628,8 @@ def analyze_changes(file_path: str) -> None:
     print(f"Analyzing changes for {file_path}")
     
     try:
-        current_content = get_file_content(file_path)
+        if current_content is None:
+            current_content = get_file_content(file_path)
         if not current_content:
             error_msg = f"Could not read current content of {file_path}"
             print(error_msg)
@@ -428,7 +645,8 @@ def analyze_changes(file_path: str) -> None:
             print("No documentation changes required")
             return
             
-        previous_content = get_previous_content(file_path)
+        if previous_content is None:
+            previous_content = get_previous_content(file_path)
         if not previous_content:
             print(f"No previous version found for {file_path}, treating as new file")
             current_elements = extract_api_elements(current_content)
@@ -490,6 +708,48 @@ def analyze_changes(file_path: str) -> None:
             f"Error message: {error_msg}\n\nPlease check the file and try again."
         )
 
+def analyze_commit_range(before: str, after: str) -> None:
+    """Analyze every Python file changed between a push's before and after commits once."""
+    plan = plan_commit_range(before, after)
+    if not plan:
+        print(f"No Python file changes between {before} and {after}")
+        return
+
+    print(f"Planned {len(plan)} changed file(s) between {before} and {after}")
+    contents = get_range_contents(before, after, plan)
+    for entry in plan:
+        if entry['status'] == 'D':
+            print(f"Skipping deleted file {entry['path']}")
+            continue
+        previous_content, current_content = contents[entry['path']]
+        analyze_changes(entry['path'], current_content, previous_content)
+
+def analyze_local_changes(file_path: str, base_ref: str = "HEAD^") -> List[Dict[str, Any]]:
+    """Print the structural API diff of a file against base_ref using only the filesystem and git."""
+    if not file_path or not isinstance(file_path, str):
+        print("ERROR: Invalid file path provided")
+        return []
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            current_content = f.read()
+    except OSError as e:
+        print(f"Error reading file directly: {e}")
+        return []
+
+    result = subprocess.run(['git', 'show', f'{base_ref}:{file_path}'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"No previous version found for {file_path} at {base_ref}, treating as new file")
+    previous_content = result.stdout if result.returncode == 0 else ""
+
+    changes = find_changes(extract_api_elements(previous_content), extract_api_elements(current_content))
+    if not changes:
+        print("No API changes detected")
+    for change in changes:
+        print(f"{change['type'].title()}: {change['name']} - {change['description']}")
+    return changes
+
 def get_current_documentation(file_path: str) -> str:
     """Get current documentation from the API folder."""
     doc_path = f"src/api/{os.path.splitext(os.path.basename(file_path))[0]}.md"
@@ -501,9 +761,20 @@ def get_current_documentation(file_path: str) -> str:
         print(f"Error reading documentation: {e}")
     return "No existing documentation found."
 
-if __name__ == '_main_':
-    if len(sys.argv) != 2:
-        print("Usage: python analyze_py_changes.py <file_path>")
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    local_only = '--local' in args
+    if local_only:
+        args.remove('--local')
+    if args[:1] == ['--range'] and len(args) == 3 and not local_only:
+        analyze_commit_range(args[1], args[2])
+        sys.exit(0)
+    if len(args) != 1:
+        print("Usage: python analyze_py_changes.py [--local] <file_path>")
+        print("       python analyze_py_changes.py --range <before_sha> <after_sha>")
         sys.exit(1)
     
-    analyze_changes(sys.argv[1])
\ No newline at end of file
+    if local_only:
+        analyze_local_changes(args[0])
+    else:
+        analyze_changes(args[0])
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import analyze_py_changes
+
+NULL_SHA = "0" * 40
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok' if condition else 'FAILED'}: {message}")
+    return condition
+
+def git(*args: str) -> str:
+    return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+
+def write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def commit(message: str) -> str:
+    git('add', '-A')
+    git('commit', '-q', '-m', message)
+    return git('rev-parse', 'HEAD')
+
+class FakeRepo:
+    """Stands in for a PyGithub repository, recording which API calls were made."""
+    def __init__(self, blobs, compare_files=None, tree_paths=None):
+        self.blobs = blobs
+        self.compare_files = compare_files or []
+        self.tree_paths = tree_paths or []
+        self.calls = []
+
+    def get_contents(self, path, ref):
+        self.calls.append(('get_contents', path, ref))
+        return SimpleNamespace(decoded_content=self.blobs[(ref, path)])
+
+    def compare(self, base, head):
+        self.calls.append(('compare', base, head))
+        return SimpleNamespace(files=self.compare_files)
+
+    def get_git_tree(self, sha, recursive=False):
+        self.calls.append(('get_git_tree', sha))
+        return SimpleNamespace(tree=[SimpleNamespace(path=p, type='blob') for p in self.tree_paths])
+
+def use_fake_github(repo: FakeRepo):
+    analyze_py_changes.get_github_client = lambda: SimpleNamespace(get_repo=lambda name: repo)
+    analyze_py_changes.get_env_vars = lambda: ("token", "owner/repo")
+
+def build_repo():
+    git('init', '-q')
+    git('config', 'user.email', 'check@example.com')
+    git('config', 'user.name', 'check')
+    write('src/api/a.py', b'def a() -> int:\n    return 0\n')
+    write('src/gone.py', b'def gone():\n    pass\n')
+    write('README.md', b'# Docs\n')
+    before = commit('base')
+    for i in range(1, 4):
+        write('src/api/a.py', f'def a() -> int:\n    return {i}\n'.encode())
+        commit(f'change a {i}')
+    os.remove('src/gone.py')
+    write('src/new file.py', b'def spaced():\n    pass\n')
+    write('src/latin.py', b'# -*- coding: latin-1 -*-\ndef caf\xe9() -> str:\n    return "\xe9"\n')
+    write('README.md', b'# Docs, changed\n')
+    after = commit('delete, add, latin-1')
+    return before, after
+
+def check_git_range(before: str, after: str) -> bool:
+    plan = analyze_py_changes.plan_commit_range(before, after)
+    statuses = {entry['path']: entry['status'] for entry in plan}
+    ok = check(len(plan) == len(statuses), "each changed file appears once in the plan")
+    ok &= check(statuses == {'src/api/a.py': 'M', 'src/gone.py': 'D', 'src/new file.py': 'A', 'src/latin.py': 'A'},
+                f"net statuses across the push are right ({statuses})")
+
+    runs = []
+    original_run = subprocess.run
+    def counting_run(args, **kwargs):
+        runs.append((args, kwargs.get('input')))
+        return original_run(args, **kwargs)
+    analyze_py_changes.subprocess.run = counting_run
+    try:
+        contents = analyze_py_changes.get_range_contents(before, after, plan)
+    finally:
+        analyze_py_changes.subprocess.run = original_run
+    requested = runs[0][1].decode('utf-8').splitlines() if runs else []
+    ok &= check(len(runs) == 1 and runs[0][0][:2] == ['git', 'cat-file'], "all blobs are read by one git cat-file process")
+    expected = [f"{before}:src/api/a.py", f"{after}:src/api/a.py", f"{before}:src/gone.py",
+                f"{after}:src/new file.py", f"{after}:src/latin.py"]
+    ok &= check(sorted(requested) == sorted(expected),
+                f"exactly one old and one new blob per existing side ({len(requested)} requested)")
+    ok &= check(contents['src/api/a.py'] == ('def a() -> int:\n    return 0\n', 'def a() -> int:\n    return 3\n'),
+                "a file changed in three commits compares the push base with the push head")
+    ok &= check(contents['src/gone.py'] == ('def gone():\n    pass\n', ''), "deleted file has only an old blob")
+    ok &= check(contents['src/new file.py'] == ('', 'def spaced():\n    pass\n'), "added file with a space in its name has only a new blob")
+    ok &= check(contents['src/latin.py'][1].endswith('def café() -> str:\n    return "é"\n'), "coding cookie is honoured when decoding")
+    return ok
+
+def check_null_base(after: str) -> bool:
+    plan = analyze_py_changes.plan_commit_range(NULL_SHA, after)
+    ok = check(sorted(entry['path'] for entry in plan) == ['src/api/a.py', 'src/latin.py', 'src/new file.py'],
+               "a new branch diffs against the empty tree")
+    ok &= check(all(entry['status'] == 'A' for entry in plan), "every file on a new branch is added")
+    contents = analyze_py_changes.get_range_contents(NULL_SHA, after, plan)
+    ok &= check(all(old == '' and new for old, new in contents.values()), "a new branch fetches only new blobs")
+    return ok
+
+def check_undecodable(before: str) -> bool:
+    write('src/api/a.py', b'def a():\n    return "\xff\xfe"\n')
+    after = commit('invalid utf-8')
+    contents = analyze_py_changes.get_range_contents(before, after, [{'path': 'src/api/a.py', 'status': 'M'}])
+    return check(contents['src/api/a.py'][1].startswith('def a():'), "an undecodable blob is replaced, not fatal")
+
+def check_github_fallbacks(after: str) -> bool:
+    missing = "1234567890abcdef1234567890abcdef12345678"
+    repo = FakeRepo(
+        blobs={(missing, 'src/api/a.py'): b'def a() -> int:\n    return -1\n'},
+        compare_files=[SimpleNamespace(filename='src/api/a.py', status='modified', previous_filename=None),
+                       SimpleNamespace(filename='src/moved.py', status='renamed', previous_filename='src/old.py'),
+                       SimpleNamespace(filename='docs/x.md', status='added', previous_filename=None)],
+        tree_paths=['src/api/a.py', 'README.md'])
+    use_fake_github(repo)
+
+    plan = analyze_py_changes.plan_commit_range(missing, after)
+    ok = check(plan == [{'path': 'src/api/a.py', 'status': 'M'}, {'path': 'src/old.py', 'status': 'D'},
+                        {'path': 'src/moved.py', 'status': 'A'}],
+               "a push base missing locally is planned with one compare call")
+    contents = analyze_py_changes.get_range_contents(missing, after, plan[:1])
+    ok &= check(contents['src/api/a.py'][0] == 'def a() -> int:\n    return -1\n', "a missing old blob is fetched through the GitHub API")
+    ok &= check([call for call in repo.calls if call[0] == 'get_contents'] == [('get_contents', 'src/api/a.py', missing)],
+                "only the missing blob goes through the GitHub API")
+
+    repo.calls.clear()
+    plan = analyze_py_changes._plan_commit_range_github(NULL_SHA, after)
+    ok &= check(plan == [{'path': 'src/api/a.py', 'status': 'A'}] and not any(c[0] == 'compare' for c in repo.calls),
+                "a new branch falls back to listing the tree, not compare")
+    return ok
+
+def test_commit_range() -> bool:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            before, after = build_repo()
+            ok = check_git_range(before, after)
+            ok &= check_null_base(after)
+            ok &= check_undecodable(before)
+            ok &= check_github_fallbacks(after)
+        finally:
+            os.chdir(cwd)
+    return ok
+
+if __name__ == "__main__":
+    print("Testing commit range planning...")
+    if test_commit_range():
+        print("✅ Commit range planning is working!")
+    else:
+        print("❌ Commit range planning is not working!")
+        sys.exit(1)
@@ -0,0 +1,294 @@
+import os
+import stat
+import sys
+import tempfile
+
+import patch_docs
+
+OLD_SOURCE = '''
+def close() -> None:
+    """Close the module."""
+
+def old(a: int) -> int:
+    """
+    Old function.
+
+    Args:
+        a (int): A
+
+    Returns:
+        int: A
+    """
+
+class A:
+    """Class A."""
+
+class B:
+    """Class B."""
+
+    def close(self) -> None:
+        """Close B."""
+'''
+
+NEW_SOURCE = '''
+def close(force: bool) -> None:
+    """
+    Close the module.
+
+    Args:
+        force (bool): Skip pending work
+    """
+
+def added(n: int) -> str:
+    """
+    Describe n.
+
+    Args:
+        n (int): Number
+
+    Returns:
+        str: Description
+    """
+
+class A:
+    """Class A."""
+
+    def baz(self, x: int) -> int:
+        """Baz x."""
+
+class B:
+    """Class B."""
+
+    def close(self) -> None:
+        """Close B for good."""
+'''
+
+OLD_DOC = """# Module
+
+## Functions
+
+### `close() -> None`
+Close the module.
+
+### `old(a: int) -> int`
+Old function.
+
+**Parameters:**
+- `a` (int): A
+
+**Returns:**
+- int: A
+
+## Classes
+
+### `A`
+Class A.
+
+### `B`
+Class B.
+
+#### Methods
+
+##### `close() -> None`
+Close B.
+"""
+
+EXPECTED_DOC = """# Module
+
+## Functions
+
+### `close(force: bool) -> None`
+Close the module.
+
+**Parameters:**
+- `force` (bool): Skip pending work
+
+### `added(n: int) -> str`
+Describe n.
+
+**Parameters:**
+- `n` (int): Number
+
+**Returns:**
+- str: Description
+
+## Classes
+
+### `A`
+Class A.
+
+#### `baz(x: int) -> int`
+Baz x.
+
+**Parameters:**
+- `x` (int)
+
+**Returns:**
+- int
+
+### `B`
+Class B.
+
+#### Methods
+
+##### `close() -> None`
+Close B for good.
+"""
+
+PROSE_OLD_SOURCE = '''
+def f(a: int) -> int:
+    """Do f."""
+
+def g(x):
+    """
+    Run g.
+
+    Raises:
+        ValueError: If x is bad
+    """
+'''
+
+PROSE_NEW_SOURCE = '''
+def f(a: int, b: int) -> int:
+    """Do f."""
+
+def g(x, y):
+    """Run g twice."""
+'''
+
+PROSE_OLD_DOC = """## Functions
+
+### `f(a: int) -> int`
+
+Do f.
+
+Example:
+
+```python
+f(1)
+```
+
+### g
+
+```python
+def g(x: Any) -> Any
+```
+Run g.
+
+**Raises:**
+- ValueError: If x is bad
+
+Note: g is slow.
+"""
+
+PROSE_EXPECTED_DOC = """## Functions
+
+### `f(a: int, b: int) -> int`
+
+Do f.
+
+**Parameters:**
+- `a` (int)
+- `b` (int)
+
+**Returns:**
+- int
+
+Example:
+
+```python
+f(1)
+```
+
+### g
+
+```python
+def g(x: Any, y: Any) -> Any
+```
+Run g twice.
+
+**Parameters:**
+- `x` (Any)
+- `y` (Any)
+
+Note: g is slow.
+"""
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok' if condition else 'FAILED'}: {message}")
+    return condition
+
+def read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def check_patching(tmp: str) -> bool:
+    doc_path = os.path.join(tmp, "README.md")
+    with open(doc_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(OLD_DOC)
+
+    ok = check(patch_docs.patch_documentation(doc_path, OLD_SOURCE, NEW_SOURCE), "changed module rewrites the doc")
+    patched = read_bytes(doc_path).decode('utf-8')
+    ok &= check(patched == EXPECTED_DOC, "functions and methods are modified, added and removed in place")
+    if patched != EXPECTED_DOC:
+        print(patched)
+
+    ok &= check(not patch_docs.patch_documentation(doc_path, OLD_SOURCE, NEW_SOURCE), "re-applying the same changes is a no-op")
+    ok &= check(read_bytes(doc_path) == EXPECTED_DOC.encode('utf-8'), "no-op leaves the file byte-identical")
+    ok &= check(not patch_docs.patch_documentation(doc_path, NEW_SOURCE, NEW_SOURCE), "unchanged module doesn't touch the doc")
+
+    removed = patch_docs.patch_markdown(EXPECTED_DOC, [{'type': 'removed', 'name': 'B.close'}], {})
+    ok &= check("Close B for good." not in removed and "Close the module." in removed,
+                "removing a method leaves the same-named function alone")
+
+    prose_path = os.path.join(tmp, "prose.md")
+    with open(prose_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(PROSE_OLD_DOC)
+    patch_docs.patch_documentation(prose_path, PROSE_OLD_SOURCE, PROSE_NEW_SOURCE)
+    patched = read_bytes(prose_path).decode('utf-8')
+    ok &= check(patched == PROSE_EXPECTED_DOC, "hand-written prose and spacing survive a signature change")
+    if patched != PROSE_EXPECTED_DOC:
+        print(patched)
+    ok &= check(not patch_docs.patch_documentation(prose_path, PROSE_OLD_SOURCE, PROSE_NEW_SOURCE),
+                "re-patching a section with prose is a no-op")
+    return ok
+
+def check_write_atomic(tmp: str) -> bool:
+    path = os.path.join(tmp, "atomic.md")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("original\n")
+    os.chmod(path, 0o640)
+
+    patch_docs.write_atomic(path, "rewritten\r\n")
+    ok = check(read_bytes(path) == b"rewritten\r\n", "write_atomic writes content without translating newlines")
+    ok &= check(stat.S_IMODE(os.stat(path).st_mode) == 0o640, "write_atomic keeps the file mode")
+
+    original_replace = os.replace
+    def failing_replace(src, dst):
+        raise OSError("simulated failure")
+    os.replace = failing_replace
+    try:
+        patch_docs.write_atomic(path, "lost\n")
+        ok &= check(False, "write_atomic raises when the rename fails")
+    except OSError:
+        ok &= check(True, "write_atomic raises when the rename fails")
+    finally:
+        os.replace = original_replace
+    ok &= check(read_bytes(path) == b"rewritten\r\n", "failed write leaves the original intact")
+    ok &= check(sorted(os.listdir(tmp)) == ["atomic.md"], "no temporary files are left behind")
+    return ok
+
+def test_patch_docs() -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = check_patching(tmp)
+    with tempfile.TemporaryDirectory() as tmp:
+        ok &= check_write_atomic(tmp)
+    return ok
+
+if __name__ == "__main__":
+    print("Testing Markdown doc patcher...")
+    if test_patch_docs():
+        print("✅ Doc patcher is working!")
+    else:
+        print("❌ Doc patcher is not working!")
+        sys.exit(1)
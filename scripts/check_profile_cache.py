@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "api"))
+
+import users
+from users import MISSING, ProfileCache
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok' if condition else 'FAILED'}: {message}")
+    return condition
+
+def check_racing_put() -> bool:
+    cache = ProfileCache()
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    cache.put(1, {"id": 1, "name": "stale"}, generation)
+    ok = check(cache.get(1) is MISSING, "a put after invalidate is dropped")
+    cache.put(1, {"id": 1, "name": "fresh"}, cache.generation(1))
+    ok &= check(cache.get(1) == {"id": 1, "name": "fresh"}, "a put with a current generation is stored")
+
+    generation = cache.generation(2)
+    cache.clear()
+    cache.put(2, "stale", generation)
+    ok &= check(cache.get(2) is MISSING, "a put started before clear is dropped")
+    return ok
+
+def check_generation_bound() -> bool:
+    cache = ProfileCache(max_size=4)
+    generation = cache.generation(0)
+    for user_id in range(1, 10):
+        cache.invalidate(user_id)
+    ok = check(len(cache._generations) <= 4, f"generation table stays bounded ({len(cache._generations)} keys)")
+    cache.put(0, "stale", generation)
+    ok &= check(cache.get(0) is MISSING, "a put started before the table was reset is dropped")
+    return ok
+
+def check_eviction() -> bool:
+    cache = ProfileCache(max_size=2)
+    for user_id in (1, 2):
+        cache.put(user_id, user_id, cache.generation(user_id))
+    cache.get(1)
+    cache.put(3, 3, cache.generation(3))
+    ok = check(cache.get(2) is MISSING, "the least recently used entry is evicted at max_size")
+    ok &= check(cache.get(1) == 1 and cache.get(3) == 3, "recently used entries are kept")
+    ok &= check(cache.stats()["size"] == 2, "cache size stays at max_size")
+    return ok
+
+def check_expiry() -> bool:
+    cache = ProfileCache(ttl=0.05)
+    cache.put(1, "data", cache.generation(1))
+    ok = check(cache.get(1) == "data", "an entry is served before its TTL")
+    time.sleep(0.1)
+    ok &= check(cache.get(1) is MISSING, "an entry expires after its TTL")
+    ok &= check(cache.stats() == {"hits": 1, "misses": 1, "size": 0}, "expired entries are removed and counted as misses")
+    return ok
+
+def check_none_cached() -> bool:
+    cache = ProfileCache()
+    cache.put(999, None, cache.generation(999))
+    ok = check(cache.get(999) is None, "a cached None is returned as a hit")
+    ok &= check(cache.stats()["hits"] == 1 and cache.stats()["misses"] == 0, "a cached None counts as a hit")
+    return ok
+
+def check_profiles() -> bool:
+    backend = users.get_backend()
+    calls = []
+    original_get_user = backend.get_user
+    def get_user(user_id):
+        calls.append(user_id)
+        return original_get_user(user_id)
+    backend.get_user = get_user
+    users.profile_cache.clear()
+    try:
+        first = users.UserProfile(5).get_profile_data()
+        first["name"] = "mutated"
+        second = users.UserProfile(5).get_profile_data()
+        ok = check(second == {"id": 5, "name": "User 5"}, "mutating profile data doesn't change the cache")
+        ok &= check(calls == [5], "profiles of the same user share one fetch")
+
+        users.UserProfile(0).data
+        users.UserProfile(0).data
+        ok &= check(calls == [5, 0], "an unknown user is fetched once")
+
+        profile = users.UserProfile(5)
+        profile.data
+        users.update_user(5, "renamed")
+        profile.data
+        ok &= check(calls == [5, 0, 5], "a long-lived profile refetches after an update")
+    finally:
+        del backend.get_user
+        users.profile_cache.clear()
+    return ok
+
+def test_profile_cache() -> bool:
+    ok = True
+    for scenario in (check_racing_put, check_generation_bound, check_eviction, check_expiry,
+                     check_none_cached, check_profiles):
+        ok &= scenario()
+    return ok
+
+if __name__ == "__main__":
+    print("Testing user profile cache...")
+    if test_profile_cache():
+        print("✅ Profile cache is working!")
+    else:
+        print("❌ Profile cache is not working!")
+        sys.exit(1)
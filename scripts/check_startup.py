@@ -0,0 +1,73 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULE = "analyze_py_changes"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Budget for importing the analyzer, measured as the cumulative import time it reports.
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "100"))
+RUNS = int(os.getenv("STARTUP_RUNS", "5"))
+# Backends that must only be imported on first use.
+LAZY_MODULES = ["github", "requests"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile_imports() -> Tuple[List[Tuple[str, int, int, int]], List[str]]:
+    """Import the analyzer under -X importtime.
+
+    Returns (module, self_us, cumulative_us, depth) rows and the lazy backends that got loaded.
+    """
+    code = f"import sys, {MODULE}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=SCRIPTS_DIR, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return rows, loaded
+
+def print_report(rows: List[Tuple[str, int, int, int]], top: int = 15) -> None:
+    """Print the slowest top-level imports pulled in by the analyzer."""
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:16.2f} {self_us / 1000:10.2f}  {'  ' * depth}{name}")
+
+def test_startup_budget() -> bool:
+    samples: Dict[str, List[int]] = {}
+    loaded = []
+    rows = []
+    for _ in range(RUNS):
+        rows, loaded = profile_imports()
+        for name, _, cumulative_us, _ in rows:
+            samples.setdefault(name, []).append(cumulative_us)
+
+    print_report(rows)
+
+    if MODULE not in samples:
+        print(f"Error: {MODULE} did not appear in the import-time profile")
+        return False
+    median_ms = statistics.median(samples[MODULE]) / 1000
+    print(f"\n{MODULE} import time: {median_ms:.2f} ms (median of {RUNS}, budget {BUDGET_MS:.0f} ms)")
+
+    ok = True
+    if loaded:
+        print(f"Error: backends imported eagerly: {', '.join(loaded)}")
+        ok = False
+    if median_ms > BUDGET_MS:
+        print("Error: import time is over budget")
+        ok = False
+    return ok
+
+if __name__ == "__main__":
+    print("Checking analyzer startup time...")
+    if test_startup_budget():
+        print("✅ Startup time is within budget!")
+    else:
+        print("❌ Startup time regression!")
+        sys.exit(1)
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import analyze_py_changes
+
+CHUNK_DELAY = 0.2
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    """Serves streamGenerateContent as chunked server-sent events, one text chunk per event."""
+    protocol_version = "HTTP/1.1"
+    chunks: List[str] = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in self.chunks:
+                event = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+                # Real servers send raw UTF-8 rather than \u escapes
+                payload = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+                self.wfile.write(f"{len(payload):X}\r\n".encode("ascii") + payload + b"\r\n")
+                self.wfile.flush()
+                time.sleep(CHUNK_DELAY)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def run_scenario(chunks: List[str]):
+    StubGeminiHandler.chunks = chunks
+    start = time.monotonic()
+    result = analyze_py_changes.stream_documentation_verdict("prompt", "stub-key")
+    return result, time.monotonic() - start
+
+def test_streaming_verdict() -> bool:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GEMINI_API_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/stub"
+
+    ok = True
+    try:
+        no_change = ['```json\n{"change_', 'required": false,', ' "updated_doc": null', '}\n```'] + ["padding "] * 10
+        result, elapsed = run_scenario(no_change)
+        print(f"No-change verdict: {result} after {elapsed:.2f}s")
+        if result != {"change_required": False, "updated_doc": None}:
+            print("Error: wrong verdict for fenced no-change output")
+            ok = False
+        if elapsed > CHUNK_DELAY * 4:
+            print("Error: stream was not terminated early")
+            ok = False
+
+        spaced = ['{\n  "change_required"', '   :\n\n      ', '      \n  false,', '\n  "updated_doc": null\n}'] + ["padding "] * 10
+        result, elapsed = run_scenario(spaced)
+        print(f"Whitespace-split verdict: {result} after {elapsed:.2f}s")
+        if result != {"change_required": False, "updated_doc": None}:
+            print("Error: wrong verdict for whitespace-split output")
+            ok = False
+        if elapsed > CHUNK_DELAY * 4:
+            print("Error: stream with a whitespace-split verdict was not terminated early")
+            ok = False
+
+        change = ['Here you go:\n```json\n{"change_required": true, ', '"updated_doc": "## Größe {section} → naïve 文档"', '}\n```']
+        result, elapsed = run_scenario(change)
+        print(f"Change verdict: {result} after {elapsed:.2f}s")
+        if result != {"change_required": True, "updated_doc": "## Größe {section} → naïve 文档"}:
+            print("Error: fenced JSON with a change was not parsed")
+            ok = False
+    finally:
+        server.shutdown()
+    return ok
+
+if __name__ == "__main__":
+    print("Testing streaming documentation check against a local stub...")
+    if test_streaming_verdict():
+        print("✅ Streaming verdict is working!")
+    else:
+        print("❌ Streaming verdict is not working!")
+        sys.exit(1)
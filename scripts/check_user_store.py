@@ -0,0 +1,181 @@
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "api"))
+
+import users
+from user_store import AsyncSQLiteUserBackend, SQLiteUserBackend
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok' if condition else 'FAILED'}: {message}")
+    return condition
+
+def check_batching(path: str) -> bool:
+    backend = SQLiteUserBackend(path)
+    batcher = backend.batcher
+    try:
+        # Holding the batcher's lock keeps the writer from taking a partial batch
+        with batcher._cond:
+            futures = [batcher.submit("INSERT INTO users (name) VALUES (?)", (f"user {i}",)) for i in range(50)]
+        for future in futures:
+            future.result()
+        ok = check(batcher.transactions == 1, f"50 queued writes committed in {batcher.transactions} transaction(s)")
+        ids = [future.result()[0] for future in futures]
+        ok &= check(len(set(ids)) == 50, "each write got its own id")
+    finally:
+        backend.close()
+    return ok
+
+def check_read_your_writes(path: str) -> bool:
+    backend = SQLiteUserBackend(path)
+    try:
+        future = backend.batcher.submit("INSERT INTO users (name) VALUES (?)", ("queued",))
+        backend.flush()
+        ok = check(future.done(), "flush waits for queued writes")
+        user_id = future.result()[0]
+        ok &= check(backend.get_user(user_id) == {"id": user_id, "name": "queued"}, "flushed write is visible to reads")
+        user = backend.create_user("direct")
+        ok &= check(backend.get_user(user["id"]) == user, "create_user is readable immediately")
+        ok &= check(backend.update_user(user["id"], "renamed") == {"id": user["id"], "name": "renamed"}, "update_user returns the user")
+        ok &= check(backend.get_user(user["id"])["name"] == "renamed", "update is visible to reads")
+        ok &= check(backend.delete_user(user["id"]) == {"status": "deleted"}, "delete_user reports deletion")
+        ok &= check(backend.get_user(user["id"]) is None, "deleted user is not found")
+        ok &= check(backend.update_user(user["id"], "x") is None, "update of a missing user returns None")
+        ok &= check(backend.delete_user(user["id"]) is None, "delete of a missing user returns None")
+    finally:
+        backend.close()
+    return ok
+
+def check_failed_write(path: str) -> bool:
+    first = SQLiteUserBackend(path)
+    second = SQLiteUserBackend(path)
+    try:
+        a, b = first.create_user("a"), second.create_user("b")
+        ok = check(a["id"] != b["id"], "two backends on one file assign distinct ids")
+
+        batcher = first.batcher
+        with batcher._cond:
+            good = batcher.submit("INSERT INTO users (name) VALUES (?)", ("y",))
+            bad = batcher.submit("INSERT INTO users (name) VALUES (?)", (None,))
+            other = batcher.submit("INSERT INTO users (name) VALUES (?)", ("z",))
+        first.flush()
+        ok &= check(isinstance(bad.exception(), sqlite3.IntegrityError), "failing write reports its error to its caller")
+        ok &= check(good.exception() is None and other.exception() is None, "batch-mates of a failing write succeed")
+        names = {user["name"] for user in first.list_users()}
+        ok &= check({"y", "z"} <= names, "batch-mates of a failing write are committed")
+    finally:
+        first.close()
+        second.close()
+    return ok
+
+def check_close_drains(path: str) -> bool:
+    backend = SQLiteUserBackend(path)
+    with backend.batcher._cond:
+        futures = [backend.batcher.submit("INSERT INTO users (name) VALUES (?)", (f"drain {i}",)) for i in range(20)]
+    backend.close()
+    ok = check(all(future.done() and future.exception() is None for future in futures), "close commits pending writes")
+    reopened = SQLiteUserBackend(path)
+    try:
+        names = {user["name"] for user in reopened.list_users()}
+        ok &= check(all(f"drain {i}" in names for i in range(20)), "drained writes are persisted")
+    finally:
+        reopened.close()
+    return ok
+
+def check_sequential_batch(path: str) -> bool:
+    backend = SQLiteUserBackend(path)
+    previous = users.get_backend()
+    users.set_backend(backend)
+    try:
+        with users.batch():
+            created = [users.create_user(f"seq {i}") for i in range(300)]
+            ok = check(users.get_user(created[-1]["id"]) == created[-1], "writes are readable inside the batch")
+        ok &= check(backend.batch_transactions == 1 and backend.batcher.transactions == 0,
+                    f"300 sequential creates committed in {backend.batch_transactions + backend.batcher.transactions} transaction(s)")
+        ok &= check(len({user["id"] for user in created}) == 300, "batched creates get distinct ids")
+
+        with users.batch():
+            users.update_user(created[0]["id"], "renamed")
+            try:
+                backend.create_user(None)
+                ok &= check(False, "a failing write inside a batch raises to its caller")
+            except sqlite3.IntegrityError:
+                ok &= check(True, "a failing write inside a batch raises to its caller")
+        ok &= check(backend.get_user(created[0]["id"])["name"] == "renamed", "other writes in the batch still commit")
+
+        try:
+            with users.batch():
+                users.update_user(created[1]["id"], "rolled back")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        ok &= check(users.get_user(created[1]["id"])["name"] == "seq 1", "a batch that raises is rolled back")
+
+        users.set_backend(previous)
+        users.set_backend(backend)
+        ok &= check(users.create_user("after switch")["id"] > 0, "a backend set again after switching away still writes")
+    finally:
+        users.set_backend(previous)
+        backend.close()
+    return ok
+
+def check_concurrent_writers(path: str) -> bool:
+    backend = SQLiteUserBackend(path)
+    try:
+        def write():
+            for i in range(200):
+                backend.create_user("concurrent")
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        count = sum(1 for user in backend.list_users() if user["name"] == "concurrent")
+        ok = check(count == 800, f"800 concurrent creates persisted ({count})")
+        ok &= check(backend.batcher.transactions < 800, f"concurrent creates shared {backend.batcher.transactions} transactions")
+    finally:
+        backend.close()
+    return ok
+
+def check_async(path: str) -> bool:
+    async def run():
+        backend = AsyncSQLiteUserBackend(path)
+        try:
+            users = await asyncio.gather(*(backend.create_user(f"async {i}") for i in range(10)))
+            ok = check(len({user["id"] for user in users}) == 10, "async creates assign distinct ids")
+            ok &= check(await backend.get_user(users[0]["id"]) == users[0], "async get_user reads a created user")
+            ok &= check(await backend.delete_user(users[0]["id"]) == {"status": "deleted"}, "async delete_user works")
+            ok &= check(await backend.get_user(users[0]["id"]) is None, "async get_user of a deleted user returns None")
+        finally:
+            await backend.close()
+        return ok
+    return asyncio.run(run())
+
+def check_memory_rejected() -> bool:
+    try:
+        SQLiteUserBackend(":memory:")
+    except ValueError:
+        return check(True, ":memory: is rejected")
+    return check(False, ":memory: is rejected")
+
+def test_user_store() -> bool:
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, scenario in enumerate([check_batching, check_read_your_writes, check_failed_write,
+                                      check_close_drains, check_sequential_batch,
+                                      check_concurrent_writers, check_async]):
+            ok &= scenario(os.path.join(tmp, f"users{i}.db"))
+    ok &= check_memory_rejected()
+    return ok
+
+if __name__ == "__main__":
+    print("Testing SQLite users backend...")
+    if test_user_store():
+        print("✅ SQLite users backend is working!")
+    else:
+        print("❌ SQLite users backend is not working!")
+        sys.exit(1)
@@ -0,0 +1,352 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from analyze_py_changes import extract_api_elements, find_changes
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*$')
+_ANCHOR = re.compile(r'`?([A-Za-z_]\w*)')
+_DOCSTRING_SECTIONS = ('Args', 'Arguments', 'Parameters', 'Returns', 'Raises')
+_ARG_LINE = re.compile(r'^(\w+)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$')
+_GENERATED_BLOCKS = ('Parameters', 'Returns', 'Raises')
+_BLOCK_MARKER = re.compile(r'^\*\*(Parameters|Returns|Raises):\*\*\s*$')
+
+def parse_docstring(docstring: str) -> Dict[str, Any]:
+    """Split a Google-style docstring into summary, args, returns and raises."""
+    parsed = {'summary': [], 'args': {}, 'returns': [], 'raises': []}
+    section = 'summary'
+    for line in docstring.splitlines():
+        stripped = line.strip()
+        if stripped.rstrip(':') in _DOCSTRING_SECTIONS and stripped.endswith(':'):
+            section = stripped[:-1].lower()
+            if section in ('arguments', 'parameters'):
+                section = 'args'
+            continue
+        if section == 'summary':
+            parsed['summary'].append(stripped)
+        elif not stripped:
+            continue
+        elif section == 'args':
+            match = _ARG_LINE.match(stripped)
+            if match:
+                parsed['args'][match.group(1)] = (match.group(2), match.group(3))
+        else:
+            parsed[section].append(stripped)
+    parsed['summary'] = "\n".join(parsed['summary']).strip()
+    return parsed
+
+def render_heading_title(name: str, element: Dict[str, Any]) -> str:
+    """Render the text of an element's heading, e.g. `divide(a: int, b: int) -> float`."""
+    name = name.rpartition('.')[2]
+    if element['type'] != 'function':
+        return f"`{name}`"
+    params = [(p, t) for p, t in element.get('params', []) if p not in ('self', 'cls')]
+    args = ", ".join(f"{p}: {t}" for p, t in params)
+    return f"`{name}({args}) -> {element.get('returns', 'Any')}`"
+
+def _render_blocks(name: str, element: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Render the generated parts of a section: signature, summary and the Parameters/Returns/Raises blocks."""
+    doc = parse_docstring(element.get('docstring', ''))
+    blocks = {'signature': [], 'summary': doc['summary'].splitlines()}
+    if element['type'] != 'function':
+        return blocks
+
+    blocks['signature'] = ["```python", f"def {render_heading_title(name, element).strip('`')}", "```"]
+    params = [(p, t) for p, t in element.get('params', []) if p not in ('self', 'cls')]
+    if params:
+        blocks['Parameters'] = ["**Parameters:**"]
+        for param, param_type in params:
+            doc_type, description = doc['args'].get(param, (None, ""))
+            entry = f"- `{param}` ({doc_type or param_type})"
+            blocks['Parameters'].append(f"{entry}: {description}" if description else entry)
+    if doc['returns'] or element.get('returns', 'Any') not in ('Any', 'None'):
+        blocks['Returns'] = ["**Returns:**"]
+        blocks['Returns'] += [f"- {entry}" for entry in doc['returns']] or [f"- {element['returns']}"]
+    if doc['raises']:
+        blocks['Raises'] = ["**Raises:**"] + [f"- {entry}" for entry in doc['raises']]
+    return blocks
+
+def render_section_body(name: str, element: Dict[str, Any], with_signature_block: bool = False) -> List[str]:
+    """Render the Markdown lines that follow an element's heading."""
+    blocks = _render_blocks(name, element)
+    lines = list(blocks['signature']) if with_signature_block else []
+    lines += blocks['summary']
+    for key in _GENERATED_BLOCKS:
+        if key in blocks:
+            lines += [""] + blocks[key]
+    return lines
+
+def _parse_headings(lines: List[str]) -> List[Tuple[int, int, str]]:
+    """Return (line index, level, title) for every heading outside fenced code blocks."""
+    headings = []
+    in_fence = False
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            headings.append((i, len(match.group(1)), match.group(2)))
+    return headings
+
+def _anchor_name(title: str) -> Optional[str]:
+    match = _ANCHOR.match(title)
+    return match.group(1) if match else None
+
+def _section_end(lines: List[str], headings: List[Tuple[int, int, str]], index: int, subtree: bool) -> int:
+    """Line index where the section opened by headings[index] ends.
+
+    With subtree=False the section stops at the next heading of any level, so
+    nested sections (a class's methods) are left untouched.
+    """
+    level = headings[index][1]
+    for line_no, next_level, _ in headings[index + 1:]:
+        if not subtree or next_level <= level:
+            return line_no
+    return len(lines)
+
+def _subtree_end_index(headings: List[Tuple[int, int, str]], index: int) -> int:
+    """Index of the first heading after headings[index] that is not nested under it."""
+    level = headings[index][1]
+    for next_index in range(index + 1, len(headings)):
+        if headings[next_index][1] <= level:
+            return next_index
+    return len(headings)
+
+def _find_heading(headings: List[Tuple[int, int, str]], name: str, class_names: Set[str]) -> Optional[int]:
+    """Find the heading for a possibly dotted name such as Class.method.
+
+    A member is only looked up inside its class's subtree, and other class
+    subtrees are skipped, so same-named functions and methods don't match each other.
+    """
+    parent, _, leaf = name.rpartition('.')
+    start, end = 0, len(headings)
+    if parent:
+        parent_index = _find_heading(headings, parent, class_names)
+        if parent_index is None:
+            return None
+        start, end = parent_index + 1, _subtree_end_index(headings, parent_index)
+
+    index = start
+    while index < end:
+        anchor = _anchor_name(headings[index][2])
+        if anchor == leaf:
+            return index
+        index = _subtree_end_index(headings, index) if anchor in class_names else index + 1
+    return None
+
+def _find_titled(headings: List[Tuple[int, int, str]], title: str, start: int = 0,
+                 end: Optional[int] = None) -> Optional[int]:
+    for index in range(start, len(headings) if end is None else end):
+        if headings[index][2].strip().lower() == title.lower():
+            return index
+    return None
+
+def _is_prose(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and not (stripped.startswith(("```", "- ", "* ", "#")) or _BLOCK_MARKER.match(stripped))
+
+def _merge_body(body: List[str], blocks: Dict[str, List[str]], with_signature_block: bool) -> List[str]:
+    """Update the generated parts of an existing section body, leaving hand-written lines alone.
+
+    The signature block and the first paragraph (the summary) are replaced,
+    Parameters/Returns/Raises blocks are replaced, added or dropped, and every
+    other line, including blank-line spacing, examples and notes, is kept.
+    """
+    merged = []
+    i, n = 0, len(body)
+    while i < n and not body[i].strip():
+        merged.append(body[i])
+        i += 1
+
+    if with_signature_block and blocks['signature']:
+        if i < n and body[i].lstrip().startswith("```"):
+            close = next((j for j in range(i + 1, n) if body[j].lstrip().startswith("```")), n - 1)
+            i = close + 1
+        merged += blocks['signature']
+
+    # Only the summary's first paragraph is generated; later paragraphs stay as prose
+    summary = blocks['summary'][:blocks['summary'].index("")] if "" in blocks['summary'] else blocks['summary']
+    if i < n and _is_prose(body[i]):
+        start = i
+        while i < n and _is_prose(body[i]):
+            i += 1
+        merged += summary or body[start:i]
+    elif summary:
+        merged += summary
+        if i < n and body[i].strip():
+            merged.append("")
+
+    block_ends = {None: len(merged)}
+    while i < n:
+        marker = _BLOCK_MARKER.match(body[i].strip())
+        if not marker:
+            merged.append(body[i])
+            i += 1
+            continue
+        key = marker.group(1)
+        i += 1
+        while i < n and body[i].startswith(("- ", "  ")) and body[i].strip():
+            i += 1
+        if key in blocks:
+            merged += blocks[key]
+            block_ends[key] = len(merged)
+        elif merged and not merged[-1].strip():
+            merged.pop()
+
+    # Blocks the section didn't have yet go after the generated block that precedes them
+    for position, key in enumerate(_GENERATED_BLOCKS):
+        if key not in blocks or key in block_ends:
+            continue
+        at = max(end for k, end in block_ends.items() if k is None or k in _GENERATED_BLOCKS[:position])
+        added = [""] + blocks[key]
+        merged[at:at] = added
+        block_ends = {k: end + len(added) if end > at else end for k, end in block_ends.items()}
+        block_ends[key] = at + len(added)
+    return merged
+
+def _insert_section(lines: List[str], headings: List[Tuple[int, int, str]], name: str,
+                    element: Dict[str, Any], class_names: Set[str]) -> None:
+    """Insert a new section at the end of the Functions/Classes group, or under its parent class."""
+    parent = element.get('parent')
+    parent_index = _find_heading(headings, parent, class_names) if parent else None
+    if parent_index is not None:
+        group_index = _find_titled(headings, "Methods", parent_index + 1,
+                                   _subtree_end_index(headings, parent_index))
+        group_index = parent_index if group_index is None else group_index
+    else:
+        group_index = _find_titled(headings, "Classes" if element['type'] == 'class' else "Functions")
+
+    if group_index is None:
+        level = 3
+        insert_at = len(lines)
+        block = ["", f"## {'Classes' if element['type'] == 'class' else 'Functions'}"]
+    else:
+        level = min(headings[group_index][1] + 1, 6)
+        insert_at = _section_end(lines, headings, group_index, subtree=True)
+        block = []
+    while insert_at > 0 and not lines[insert_at - 1].strip():
+        insert_at -= 1
+
+    block += ["", f"{'#' * level} {render_heading_title(name, element)}"] + render_section_body(name, element)
+    if insert_at < len(lines) and lines[insert_at].strip():
+        block.append("")
+    lines[insert_at:insert_at] = block
+
+def patch_markdown(markdown: str, changes: List[Dict[str, Any]], elements: Dict[str, Dict[str, Any]],
+                   old_elements: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Apply find_changes output to Markdown, rewriting only the sections of changed elements.
+
+    elements are the new API elements; old_elements lets removed classes be
+    recognised so their methods aren't mistaken for module functions.
+    """
+    trailing_newline = markdown.endswith("\n")
+    lines = markdown.splitlines()
+    class_names = {name.rpartition('.')[2]
+                   for known in (elements, old_elements or {})
+                   for name, element in known.items() if element['type'] == 'class'}
+
+    for change in changes:
+        name = change['name']
+        if any(part.startswith('_') for part in name.split('.')):
+            continue
+        headings = _parse_headings(lines)
+        index = _find_heading(headings, name, class_names)
+
+        if change['type'] == 'removed':
+            if index is not None:
+                start = headings[index][0]
+                end = _section_end(lines, headings, index, subtree=True)
+                if end == len(lines):
+                    while start > 0 and not lines[start - 1].strip():
+                        start -= 1
+                del lines[start:end]
+            continue
+
+        element = elements.get(name)
+        if element is None:
+            continue
+        if index is None:
+            _insert_section(lines, headings, name, element, class_names)
+            continue
+
+        line_no, level, title = headings[index]
+        signature_heading = '(' in title or element['type'] == 'class'
+        if signature_heading:
+            lines[line_no] = f"{'#' * level} {render_heading_title(name, element)}"
+        end = _section_end(lines, headings, index, subtree=False)
+        lines[line_no + 1:end] = _merge_body(lines[line_no + 1:end], _render_blocks(name, element),
+                                             with_signature_block=not signature_heading)
+
+    patched = "\n".join(lines)
+    return patched + "\n" if trailing_newline else patched
+
+def write_atomic(path: str, content: str) -> None:
+    """Write content to path via a temporary file and rename, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        f = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    try:
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def find_doc_file(py_file: str) -> Optional[str]:
+    """Find the Markdown file documenting py_file: <module>.md next to it, else the directory's README.md."""
+    directory = os.path.dirname(py_file)
+    for candidate in (f"{os.path.splitext(py_file)[0]}.md", os.path.join(directory, "README.md")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def patch_documentation(doc_path: str, old_content: str, new_content: str) -> bool:
+    """Patch doc_path for the API changes between two versions of a module. Returns True if it was rewritten."""
+    old_elements = extract_api_elements(old_content)
+    new_elements = extract_api_elements(new_content)
+    changes = find_changes(old_elements, new_elements)
+    if not changes:
+        print("No API changes detected")
+        return False
+
+    with open(doc_path, 'r', encoding='utf-8', newline='') as f:
+        markdown = f.read()
+    patched = patch_markdown(markdown, changes, new_elements, old_elements)
+    if patched == markdown:
+        print(f"{doc_path} is already up to date")
+        return False
+
+    write_atomic(doc_path, patched)
+    print(f"Patched {doc_path} for {len(changes)} change(s)")
+    return True
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python patch_docs.py <file_path> [base_ref]")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    base_ref = sys.argv[2] if len(sys.argv) == 3 else "HEAD^"
+    doc_path = find_doc_file(file_path)
+    if not doc_path:
+        print(f"ERROR: No documentation file found for {file_path}")
+        sys.exit(1)
+
+    result = subprocess.run(['git', 'show', f'{base_ref}:{file_path}'], capture_output=True, text=True)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        current_content = f.read()
+    patch_documentation(doc_path, result.stdout if result.returncode == 0 else "", current_content)
@@ -0,0 +1,343 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+# Persistence backends for the users API
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+_SELECT_USER = "SELECT id, name FROM users WHERE id = ?"
+_SELECT_USERS = "SELECT id, name FROM users ORDER BY id"
+_INSERT_USER = "INSERT INTO users (name) VALUES (?)"
+_UPDATE_USER = "UPDATE users SET name = ? WHERE id = ?"
+_DELETE_USER = "DELETE FROM users WHERE id = ?"
+
+def _execute_isolated(conn, sql: str, params: tuple):
+    """Runs one write in its own savepoint so a failure rolls back only that write.
+
+    Returns (lastrowid, rowcount).
+    """
+    conn.execute("SAVEPOINT write")
+    try:
+        cursor = conn.execute(sql, params)
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO write")
+        conn.execute("RELEASE write")
+        raise
+    conn.execute("RELEASE write")
+    return cursor.lastrowid, cursor.rowcount
+
+class UserBackend(ABC):
+    """Interface implemented by every users API backend.
+
+    Lookups and writes for an id with no user return None.
+    """
+    @abstractmethod
+    def get_user(self, user_id: int):
+        """Returns the user as a dict, or None if there is no such user."""
+
+    @abstractmethod
+    def list_users(self):
+        """Returns every user as a list of dicts."""
+
+    @abstractmethod
+    def create_user(self, name: str):
+        """Creates a user and returns it, including its assigned id."""
+
+    @abstractmethod
+    def update_user(self, user_id: int, name: str):
+        """Renames a user and returns it, or None if there is no such user."""
+
+    @abstractmethod
+    def delete_user(self, user_id: int):
+        """Deletes a user and returns {"status": "deleted"}, or None if there is no such user."""
+
+    def batch(self):
+        """Returns a context manager that groups the calling thread's writes; a no-op by default."""
+        return nullcontext()
+
+    def close(self):
+        pass
+
+class SampleUserBackend(UserBackend):
+    """Returns canned sample data without persisting anything; every positive id exists."""
+    def get_user(self, user_id: int):
+        if user_id < 1:
+            return None
+        return {"id": user_id, "name": f"User {user_id}"}
+
+    def list_users(self):
+        return [{"id": 1, "name": "User 1"}, {"id": 2, "name": "User 2"}]
+
+    def create_user(self, name: str):
+        return {"name": name, "id": 3}
+
+    def update_user(self, user_id: int, name: str):
+        if user_id < 1:
+            return None
+        return {"id": user_id, "name": name}
+
+    def delete_user(self, user_id: int):
+        if user_id < 1:
+            return None
+        return {"status": "deleted"}
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections opened in WAL mode.
+
+    Every connection must see the same database, so path has to be a file;
+    ":memory:" would give each pooled connection its own empty database.
+    """
+    def __init__(self, path: str, size: int = 4, timeout: float = 30.0):
+        if path == ":memory:" or path.startswith("file::memory:"):
+            raise ValueError("In-memory SQLite databases are not supported; use a file path")
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        # The statement cache keeps the parameterised queries above prepared per connection
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               isolation_level=None, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+class WriteBehindBatcher:
+    """Queues write statements and commits them in grouped transactions on a background thread.
+
+    Each submit gets a Future that resolves to the statement's cursor once its
+    transaction commits, or to the error that statement raised. Statements run
+    in their own savepoint, so a failing write doesn't roll back its batch-mates.
+    """
+    def __init__(self, pool: ConnectionPool, batch_size: int = 256):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.transactions = 0
+        self._pending = []
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="user-store-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def has_pending(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._in_flight > 0
+
+    def submit(self, sql: str, params: tuple) -> Future:
+        """Queues a write for the next batch and returns a Future for its result."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write batcher is closed")
+            self._pending.append((sql, params, future))
+            self._cond.notify_all()
+        return future
+
+    def flush(self):
+        """Blocks until every write queued so far has been committed or has failed.
+
+        Errors are reported through each write's own Future, not here.
+        """
+        with self._cond:
+            while self._pending or self._in_flight:
+                self._cond.wait()
+
+    def close(self):
+        """Commits all pending writes and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Writes queued while the previous batch committed are grouped into this one
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                self._in_flight = len(batch)
+            self._commit(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _commit(self, batch):
+        results = []
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for sql, params, future in batch:
+                        try:
+                            results.append((future, _execute_isolated(conn, sql, params), None))
+                        except sqlite3.Error as e:
+                            results.append((future, None, e))
+                    conn.execute("COMMIT")
+                    self.transactions += 1
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            print(f"ERROR: Failed to commit batch of {len(batch)} user writes: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+class SQLiteUserBackend(UserBackend):
+    """SQLite-backed users store with pooled connections and write-behind batching.
+
+    Writes from concurrent callers are grouped into shared transactions; each
+    call returns once its own write is committed. Inside a batch() block the
+    calling thread's writes instead share one transaction committed when the
+    block exits. Reads flush any queued writes first so they always see
+    committed state.
+    """
+    def __init__(self, path: str, pool_size: int = 4, batch_size: int = 256):
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.execute(_SCHEMA)
+        self.batcher = WriteBehindBatcher(self.pool, batch_size=batch_size)
+        self.batch_transactions = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def batch(self):
+        """Runs the calling thread's reads and writes in one transaction, committed when the block exits.
+
+        Each write still runs in its own savepoint and raises to its caller
+        immediately; the transaction is rolled back if the block raises.
+        Other writers wait for the block to finish, so keep it short. Nested
+        blocks join the outer transaction.
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        self.batcher.flush()
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.conn = conn
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+                self.batch_transactions += 1
+            finally:
+                self._local.conn = None
+
+    def _read(self, sql: str, params: tuple = ()):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn.execute(sql, params).fetchall()
+        if self.batcher.has_pending:
+            self.batcher.flush()
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, params: tuple):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return _execute_isolated(conn, sql, params)
+        return self.batcher.submit(sql, params).result()
+
+    def get_user(self, user_id: int):
+        rows = self._read(_SELECT_USER, (user_id,))
+        if not rows:
+            return None
+        return {"id": rows[0][0], "name": rows[0][1]}
+
+    def list_users(self):
+        return [{"id": row[0], "name": row[1]} for row in self._read(_SELECT_USERS)]
+
+    def create_user(self, name: str):
+        user_id, _ = self._write(_INSERT_USER, (name,))
+        return {"name": name, "id": user_id}
+
+    def update_user(self, user_id: int, name: str):
+        _, rowcount = self._write(_UPDATE_USER, (name, user_id))
+        if not rowcount:
+            return None
+        return {"id": user_id, "name": name}
+
+    def delete_user(self, user_id: int):
+        _, rowcount = self._write(_DELETE_USER, (user_id,))
+        if not rowcount:
+            return None
+        return {"status": "deleted"}
+
+    def flush(self):
+        self.batcher.flush()
+
+    def close(self):
+        self.batcher.close()
+        self.pool.close()
+
+class AsyncSQLiteUserBackend:
+    """asyncio-facing wrapper that runs SQLiteUserBackend calls on a thread pool.
+
+    Calls may land on different pool threads, so batch() scopes don't apply;
+    concurrent calls are still grouped by the write batcher.
+    """
+    def __init__(self, path: str, max_workers: int = 4, **kwargs):
+        self.backend = SQLiteUserBackend(path, pool_size=max_workers, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="user-store")
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get_user(self, user_id: int):
+        return await self._call(self.backend.get_user, user_id)
+
+    async def list_users(self):
+        return await self._call(self.backend.list_users)
+
+    async def create_user(self, name: str):
+        return await self._call(self.backend.create_user, name)
+
+    async def update_user(self, user_id: int, name: str):
+        return await self._call(self.backend.update_user, user_id, name)
+
+    async def delete_user(self, user_id: int):
+        return await self._call(self.backend.delete_user, user_id)
+
+    async def flush(self):
+        await self._call(self.backend.flush)
+
+    async def close(self):
+        await self._call(self.backend.close)
+        self._executor.shutdown(wait=True)
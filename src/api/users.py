@@ -1,39 +1,172 @@
+import copy
 import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    from .user_store import SampleUserBackend, UserBackend
+except ImportError:
+    # Run as a script from src/api rather than imported as part of the api package
+    from user_store import SampleUserBackend, UserBackend
 
 # Sample User API Functions
 
+PROFILE_CACHE_MAX_SIZE = 1024
+PROFILE_CACHE_TTL_SECONDS = 300.0
+
+# Returned by ProfileCache.get on a miss, so a cached None (unknown user) is still a hit
+MISSING = object()
+
+class ProfileCache:
+    """Bounded LRU cache of loaded user profiles with a per-entry TTL.
+
+    Loaders take a generation token before fetching and pass it to put; a
+    put is dropped if the key was invalidated in between, so a write that
+    races with a load can never leave the old row cached.
+    """
+    def __init__(self, max_size: int = PROFILE_CACHE_MAX_SIZE, ttl: float = PROFILE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Returns the cached profile data for user_id, or MISSING on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, data = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return data
+                del self._entries[user_id]
+            self.misses += 1
+            return MISSING
+
+    def generation(self, user_id):
+        """Returns a token to pass to put for data loaded from now on."""
+        with self._lock:
+            return (self._epoch, self._generations.get(user_id, 0))
+
+    def put(self, user_id, data, generation):
+        """Stores profile data for user_id unless it was invalidated since generation was taken."""
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(user_id, 0)):
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drops the cached profile for user_id, if any, and rejects puts of loads already in flight."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if len(self._generations) >= self.max_size and user_id not in self._generations:
+                # Bound the generation table; a new epoch rejects every in-flight put instead
+                self._generations.clear()
+                self._epoch += 1
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        """Drops all cached profiles and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns hit/miss counters and the current cache size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+profile_cache = ProfileCache()
+
+_backend = SampleUserBackend()
+
+def set_backend(backend: UserBackend):
+    """Sets the persistence backend used by the users API and drops cached profiles.
+
+    The outgoing backend is left open; closing it is up to the caller.
+    """
+    global _backend
+    _backend = backend
+    profile_cache.clear()
+
+def get_backend() -> UserBackend:
+    """Returns the persistence backend used by the users API."""
+    return _backend
+
+@contextmanager
+def batch():
+    """Groups the calling thread's users API writes into one transaction where the backend supports it."""
+    try:
+        with _backend.batch():
+            yield
+    except BaseException:
+        # Profiles read inside a rolled-back batch may have been cached with uncommitted data
+        profile_cache.clear()
+        raise
+
 def get_user(user_id: int):
     """Retrieves user details by ID."""
-    # In a real app, fetch from database
     print(f"Fetching user {user_id}")
-    return {"id": user_id, "name": f"User {user_id}"}
+    return _backend.get_user(user_id)
 
 def list_users():
     """Lists all users."""
-    # In a real app, fetch from database
     print("Listing all users")
-    return [{"id": 1, "name": "User 1"}, {"id": 2, "name": "User 2"}]
+    return _backend.list_users()
 
 class UserProfile:
-    """Represents a user profile."""
+    """Represents a user profile. Profile data is loaded on first access and read through the cache."""
     def __init__(self, user_id):
         self.user_id = user_id
-        self.data = get_user(user_id) # Example usage
+
+    @property
+    def data(self):
+        # Callers get their own copy so mutating it can't corrupt the shared cache entry
+        data = profile_cache.get(self.user_id)
+        if data is MISSING:
+            generation = profile_cache.generation(self.user_id)
+            data = get_user(self.user_id)
+            profile_cache.put(self.user_id, copy.deepcopy(data), generation)
+            return data
+        return copy.deepcopy(data)
 
     def get_profile_data(self):
         return self.data
 
+def get_profile_cache_stats():
+    """Returns hit/miss counters for the user profile cache."""
+    return profile_cache.stats()
+
 def create_user(name: str):
     """Creates a new user."""
     print(f"Creating user: {name}")
-    return {"name": name, "id": 3}
+    user = _backend.create_user(name)
+    profile_cache.invalidate(user["id"])
+    return user
 
 def delete_user(user_id: int):
     """Deletes a user."""
     print(f"Deleting user: {user_id}")
-    return {"status": "deleted"}
+    result = _backend.delete_user(user_id)
+    profile_cache.invalidate(user_id)
+    return result
 
 def update_user(user_id: int, name: str):
     """Updates a user's name."""
     print(f"Updating user {user_id} to {name}")
-    return {"id": user_id, "name": name}
+    user = _backend.update_user(user_id, name)
+    profile_cache.invalidate(user_id)
+    return user